@@ -5,17 +5,32 @@ Implements 4-tier error classification with automatic recovery mechanisms
 """
 
 import logging
+import random
+import re
+import sys
+import time
 import traceback
+from collections import Counter, deque
+from types import TracebackType
 from typing import Optional, Dict, Any, Callable
 from enum import Enum
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 import asyncio
 
 logger = logging.getLogger(__name__)
 
+# slots=True needs Python 3.10+ (see roboken_complete_platform)
+_DATACLASS_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
 
-class ErrorSeverity(Enum):
+# Validation patterns, compiled once at import. They are applied with
+# fullmatch, which unlike a "$" anchor does not accept a trailing newline.
+_EMAIL_RE = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+_URL_RE = re.compile(r'https?://[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}(/.*)?')
+_DANGEROUS_RE = re.compile(r'rm\s+-rf|format|delete\s+system', re.IGNORECASE)
+
+
+class ErrorSeverity(str, Enum):
     """Error severity levels"""
     LOW = "low"
     MEDIUM = "medium"
@@ -23,7 +38,7 @@ class ErrorSeverity(Enum):
     CRITICAL = "critical"
 
 
-class ErrorCategory(Enum):
+class ErrorCategory(str, Enum):
     """Error categories for classification"""
     NETWORK = "network"
     AUTHENTICATION = "authentication"
@@ -35,7 +50,43 @@ class ErrorCategory(Enum):
     SYSTEM = "system"
 
 
-@dataclass
+# Exception types that classify without inspecting the message, most
+# specific first
+_ERROR_TYPES = (
+    (ConnectionError, ErrorCategory.NETWORK, ErrorSeverity.MEDIUM),
+    (TimeoutError, ErrorCategory.TIMEOUT, ErrorSeverity.MEDIUM),
+    (PermissionError, ErrorCategory.AUTHENTICATION, ErrorSeverity.HIGH),
+    (ValueError, ErrorCategory.VALIDATION, ErrorSeverity.LOW),
+    (MemoryError, ErrorCategory.RESOURCE, ErrorSeverity.HIGH),
+)
+
+# Message keywords per category, in priority order. 'timeout' is claimed by
+# NETWORK first, matching the original if-chain.
+_ERROR_KEYWORDS = (
+    (ErrorCategory.NETWORK, ErrorSeverity.MEDIUM,
+     ('connection', 'network', 'timeout', 'unreachable')),
+    (ErrorCategory.AUTHENTICATION, ErrorSeverity.HIGH,
+     ('auth', 'permission', 'unauthorized', 'forbidden')),
+    (ErrorCategory.VALIDATION, ErrorSeverity.LOW,
+     ('invalid', 'validation', 'format', 'parse')),
+    (ErrorCategory.RESOURCE, ErrorSeverity.HIGH,
+     ('memory', 'disk', 'resource', 'limit')),
+    (ErrorCategory.TIMEOUT, ErrorSeverity.MEDIUM,
+     ('timeout',)),
+)
+
+# Zero-width lookahead so every offset is tested; group "_<n>" is the index
+# into _ERROR_KEYWORDS
+_ERROR_KEYWORD_RE = re.compile(
+    '(?=' + '|'.join(
+        f"(?P<_{i}>{'|'.join(map(re.escape, keywords))})"
+        for i, (_, _, keywords) in enumerate(_ERROR_KEYWORDS)
+    ) + ')',
+    re.IGNORECASE
+)
+
+
+@dataclass(**_DATACLASS_OPTIONS)
 class ErrorContext:
     """Context information for error handling"""
     error_id: str
@@ -43,35 +94,58 @@ class ErrorContext:
     severity: ErrorSeverity
     message: str
     timestamp: datetime
-    stack_trace: Optional[str] = None
+    stack_trace: Optional[TracebackType] = None
     recovery_attempted: bool = False
     recovery_successful: bool = False
     metadata: Optional[Dict[str, Any]] = None
+    _formatted_stack_trace: Optional[str] = field(default=None, init=False, repr=False)
+    
+    @property
+    def formatted_stack_trace(self) -> Optional[str]:
+        """Stack trace text, formatted on first access"""
+        if self._formatted_stack_trace is None and self.stack_trace is not None:
+            self._formatted_stack_trace = ''.join(traceback.format_tb(self.stack_trace))
+        return self._formatted_stack_trace
 
 
 class RecoveryStrategy:
     """Base class for recovery strategies"""
     
-    async def attempt_recovery(self, context: ErrorContext) -> bool:
-        """Attempt to recover from error"""
+    async def attempt_recovery(self, context: ErrorContext,
+                               operation: Optional[Callable] = None) -> bool:
+        """Attempt to recover from error, optionally re-running operation"""
         raise NotImplementedError
 
 
 class RetryStrategy(RecoveryStrategy):
-    """Retry operation with exponential backoff"""
+    """Retry operation with capped exponential backoff and jitter"""
     
-    def __init__(self, max_retries: int = 3, base_delay: float = 1.0):
+    def __init__(self, max_retries: int = 3, base_delay: float = 1.0,
+                 max_delay: float = 30.0, jitter: bool = True):
         self.max_retries = max_retries
         self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+    
+    def _get_delay(self, attempt: int) -> float:
+        """Backoff delay for an attempt, capped and optionally jittered"""
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        if self.jitter:
+            # Spread concurrent retries over [delay/2, delay]
+            delay *= 0.5 + random.random() * 0.5
+        return delay
     
-    async def attempt_recovery(self, context: ErrorContext, 
-                              operation: Callable) -> bool:
+    async def attempt_recovery(self, context: ErrorContext,
+                               operation: Optional[Callable] = None) -> bool:
         """Retry operation with exponential backoff"""
+        if operation is None:
+            return False
+        
         for attempt in range(self.max_retries):
             try:
-                delay = self.base_delay * (2 ** attempt)
+                delay = self._get_delay(attempt)
                 logger.info(f"Retry attempt {attempt + 1}/{self.max_retries} "
-                          f"after {delay}s delay")
+                          f"after {delay:.2f}s delay")
                 await asyncio.sleep(delay)
                 await operation()
                 return True
@@ -88,7 +162,8 @@ class FallbackStrategy(RecoveryStrategy):
     def __init__(self, fallback_operation: Callable):
         self.fallback_operation = fallback_operation
     
-    async def attempt_recovery(self, context: ErrorContext) -> bool:
+    async def attempt_recovery(self, context: ErrorContext,
+                               operation: Optional[Callable] = None) -> bool:
         """Execute fallback operation"""
         try:
             logger.info("Attempting fallback strategy")
@@ -102,10 +177,21 @@ class FallbackStrategy(RecoveryStrategy):
 class ErrorHandler:
     """Main error handling system"""
     
-    def __init__(self):
-        self.error_log: list[ErrorContext] = []
+    def __init__(self, max_log_size: int = 100):
+        # Most recent full contexts, for debugging; statistics come from the
+        # running totals below
+        self.error_log: deque[ErrorContext] = deque(maxlen=max_log_size)
         self.recovery_strategies: Dict[ErrorCategory, RecoveryStrategy] = {}
         self.error_count = 0
+        
+        # Running totals so statistics never rescan the log
+        self._by_category: Counter = Counter()
+        self._by_severity: Counter = Counter()
+        self._recovery_attempts = 0
+        self._recovery_successes = 0
+        
+        # Strong references to in-flight alerts until they finish
+        self._alert_tasks: set[asyncio.Task] = set()
     
     def register_recovery_strategy(self, category: ErrorCategory, 
                                    strategy: RecoveryStrategy):
@@ -115,32 +201,22 @@ class ErrorHandler:
     
     def classify_error(self, exception: Exception) -> tuple[ErrorCategory, ErrorSeverity]:
         """Classify error by type and determine severity"""
-        error_type = type(exception).__name__
-        error_message = str(exception).lower()
-        
-        # Network errors
-        if any(keyword in error_message for keyword in 
-               ['connection', 'network', 'timeout', 'unreachable']):
-            return ErrorCategory.NETWORK, ErrorSeverity.MEDIUM
-        
-        # Authentication errors
-        if any(keyword in error_message for keyword in 
-               ['auth', 'permission', 'unauthorized', 'forbidden']):
-            return ErrorCategory.AUTHENTICATION, ErrorSeverity.HIGH
-        
-        # Validation errors
-        if any(keyword in error_message for keyword in 
-               ['invalid', 'validation', 'format', 'parse']):
-            return ErrorCategory.VALIDATION, ErrorSeverity.LOW
+        for error_type, category, severity in _ERROR_TYPES:
+            if isinstance(exception, error_type):
+                return category, severity
         
-        # Resource errors
-        if any(keyword in error_message for keyword in 
-               ['memory', 'disk', 'resource', 'limit']):
-            return ErrorCategory.RESOURCE, ErrorSeverity.HIGH
+        # Single scan; the highest-priority category matched anywhere wins
+        best = None
+        for match in _ERROR_KEYWORD_RE.finditer(str(exception)):
+            priority = int(match.lastgroup[1:])
+            if best is None or priority < best:
+                best = priority
+                if best == 0:
+                    break
         
-        # Timeout errors
-        if 'timeout' in error_message:
-            return ErrorCategory.TIMEOUT, ErrorSeverity.MEDIUM
+        if best is not None:
+            category, severity, _ = _ERROR_KEYWORDS[best]
+            return category, severity
         
         # Default to system error
         return ErrorCategory.SYSTEM, ErrorSeverity.CRITICAL
@@ -154,14 +230,15 @@ class ErrorHandler:
         # Classify error
         category, severity = self.classify_error(exception)
         
-        # Create error context
+        # Create error context; ID and timestamp share one clock read
+        now_ns = time.time_ns()
         context = ErrorContext(
-            error_id=f"err_{self.error_count}_{int(datetime.now().timestamp())}",
+            error_id=f"err_{self.error_count}_{now_ns // 1_000_000_000}",
             category=category,
             severity=severity,
             message=str(exception),
-            timestamp=datetime.now(),
-            stack_trace=traceback.format_exc(),
+            timestamp=datetime.fromtimestamp(now_ns / 1e9),
+            stack_trace=exception.__traceback__,
             metadata=metadata or {}
         )
         
@@ -174,10 +251,7 @@ class ErrorHandler:
             strategy = self.recovery_strategies[category]
             
             try:
-                if isinstance(strategy, RetryStrategy):
-                    success = await strategy.attempt_recovery(context, operation)
-                else:
-                    success = await strategy.attempt_recovery(context)
+                success = await strategy.attempt_recovery(context, operation)
                 
                 context.recovery_successful = success
                 
@@ -190,12 +264,20 @@ class ErrorHandler:
                 logger.error(f"Recovery attempt raised exception: {recovery_error}")
                 context.recovery_successful = False
         
-        # Log error
+        # Keep the full context and count it
         self.error_log.append(context)
+        self._by_category[category] += 1
+        self._by_severity[severity] += 1
+        if context.recovery_attempted:
+            self._recovery_attempts += 1
+            if context.recovery_successful:
+                self._recovery_successes += 1
         
-        # Alert on critical errors
+        # Alert on critical errors without blocking the caller
         if severity == ErrorSeverity.CRITICAL:
-            await self._send_critical_alert(context)
+            task = asyncio.create_task(self._send_critical_alert(context))
+            self._alert_tasks.add(task)
+            task.add_done_callback(self._alert_tasks.discard)
         
         return context
     
@@ -204,11 +286,14 @@ class ErrorHandler:
         logger.critical(f"CRITICAL ERROR ALERT: {context.error_id}")
         logger.critical(f"Category: {context.category.value}")
         logger.critical(f"Message: {context.message}")
+        if context.stack_trace is not None:
+            logger.critical(f"Stack trace:\n{context.formatted_stack_trace}")
         # In production, this would send email/SMS/Slack notification
     
     def get_error_statistics(self) -> Dict[str, Any]:
         """Get error statistics"""
-        if not self.error_log:
+        total_errors = sum(self._by_category.values())
+        if not total_errors:
             return {
                 'total_errors': 0,
                 'by_category': {},
@@ -216,37 +301,17 @@ class ErrorHandler:
                 'recovery_rate': 0.0
             }
         
-        by_category = {}
-        by_severity = {}
-        recovery_attempts = 0
-        recovery_successes = 0
-        
-        for error in self.error_log:
-            # Count by category
-            cat = error.category.value
-            by_category[cat] = by_category.get(cat, 0) + 1
-            
-            # Count by severity
-            sev = error.severity.value
-            by_severity[sev] = by_severity.get(sev, 0) + 1
-            
-            # Track recovery
-            if error.recovery_attempted:
-                recovery_attempts += 1
-                if error.recovery_successful:
-                    recovery_successes += 1
-        
         recovery_rate = (
-            recovery_successes / recovery_attempts 
-            if recovery_attempts > 0 else 0.0
+            self._recovery_successes / self._recovery_attempts 
+            if self._recovery_attempts > 0 else 0.0
         )
         
         return {
-            'total_errors': len(self.error_log),
-            'by_category': by_category,
-            'by_severity': by_severity,
-            'recovery_attempts': recovery_attempts,
-            'recovery_successes': recovery_successes,
+            'total_errors': total_errors,
+            'by_category': {cat.value: n for cat, n in self._by_category.items()},
+            'by_severity': {sev.value: n for sev, n in self._by_severity.items()},
+            'recovery_attempts': self._recovery_attempts,
+            'recovery_successes': self._recovery_successes,
             'recovery_rate': recovery_rate
         }
 
@@ -257,16 +322,12 @@ class InputValidator:
     @staticmethod
     def validate_email(email: str) -> bool:
         """Validate email format"""
-        import re
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return bool(re.match(pattern, email))
+        return _EMAIL_RE.fullmatch(email) is not None
     
     @staticmethod
     def validate_url(url: str) -> bool:
         """Validate URL format"""
-        import re
-        pattern = r'^https?://[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}(/.*)?$'
-        return bool(re.match(pattern, url))
+        return _URL_RE.fullmatch(url) is not None
     
     @staticmethod
     def validate_command(command: str) -> tuple[bool, Optional[str]]:
@@ -278,10 +339,9 @@ class InputValidator:
             return False, "Command too long (max 1000 characters)"
         
         # Check for potentially dangerous commands
-        dangerous_keywords = ['rm -rf', 'format', 'delete system']
-        for keyword in dangerous_keywords:
-            if keyword in command.lower():
-                return False, f"Command contains dangerous keyword: {keyword}"
+        match = _DANGEROUS_RE.search(command)
+        if match:
+            return False, f"Command contains dangerous keyword: {match.group()}"
         
         return True, None
     
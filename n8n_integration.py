@@ -7,13 +7,18 @@ Provides 500+ integration capabilities through n8n workflow automation
 import asyncio
 import json
 import logging
+import sys
+from collections import defaultdict
 from typing import Dict, List, Optional, Any
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 
 logger = logging.getLogger(__name__)
 
+# slots=True needs Python 3.10+ (see roboken_complete_platform)
+_DATACLASS_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
 
 class WorkflowStatus(Enum):
     """Workflow execution status"""
@@ -24,7 +29,7 @@ class WorkflowStatus(Enum):
     PAUSED = "paused"
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class WorkflowNode:
     """Represents a node in the workflow"""
     id: str
@@ -34,7 +39,7 @@ class WorkflowNode:
     position: tuple[int, int]
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class WorkflowConnection:
     """Connection between workflow nodes"""
     source_node: str
@@ -43,7 +48,7 @@ class WorkflowConnection:
     target_input: str = "main"
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class Workflow:
     """Complete workflow definition"""
     id: str
@@ -54,6 +59,8 @@ class Workflow:
     status: WorkflowStatus
     created_at: datetime
     last_executed: Optional[datetime] = None
+    # Cached execution plan from N8nWorkflowEngine._compile
+    _compiled: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
 
 
 class N8nIntegrationNode:
@@ -77,12 +84,13 @@ class GmailNode(N8nIntegrationNode):
         logger.info(f"Gmail: Sending email to {self.parameters.get('to')}")
         await asyncio.sleep(0.1)  # Simulate API call
         
+        sent_at = datetime.now()
         return {
             'success': True,
-            'message_id': f"msg_{int(datetime.now().timestamp())}",
+            'message_id': f"msg_{int(sent_at.timestamp())}",
             'to': self.parameters.get('to'),
             'subject': self.parameters.get('subject'),
-            'sent_at': datetime.now().isoformat()
+            'sent_at': sent_at.isoformat()
         }
 
 
@@ -150,23 +158,36 @@ class N8nWorkflowEngine:
             'http_request': HTTPRequestNode,
         }
         self.execution_history: List[Dict[str, Any]] = []
+        # Index of execution_history by workflow, for history lookups
+        self._history_by_wf: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        # Running totals for get_statistics
+        self._stats = {
+            'successful': 0,
+            'failed': 0,
+            'exec_time_sum': 0.0,
+            'exec_time_count': 0
+        }
         logger.info("N8n Workflow Engine initialized")
     
     def register_node_type(self, node_type: str, node_class: type):
         """Register a new node type"""
         self.node_registry[node_type] = node_class
+        # Compiled plans may hold instances of a replaced class
+        for workflow in self.workflows.values():
+            workflow._compiled = None
         logger.info(f"Registered node type: {node_type}")
     
     def create_workflow(self, name: str, description: str) -> Workflow:
         """Create a new workflow"""
+        now = datetime.now()
         workflow = Workflow(
-            id=f"wf_{int(datetime.now().timestamp())}",
+            id=f"wf_{int(now.timestamp())}",
             name=name,
             description=description,
             nodes=[],
             connections=[],
             status=WorkflowStatus.IDLE,
-            created_at=datetime.now()
+            created_at=now
         )
         
         self.workflows[workflow.id] = workflow
@@ -191,6 +212,7 @@ class N8nWorkflowEngine:
         )
         
         workflow.nodes.append(node)
+        workflow._compiled = None
         logger.info(f"Added node {node.id} ({node_type}) to workflow {workflow_id}")
         
         return node
@@ -209,6 +231,7 @@ class N8nWorkflowEngine:
         )
         
         workflow.connections.append(connection)
+        workflow._compiled = None
         logger.info(f"Connected {source_node_id} -> {target_node_id}")
     
     async def execute_workflow(self, workflow_id: str, 
@@ -224,29 +247,28 @@ class N8nWorkflowEngine:
         
         start_time = datetime.now()
         results = {}
-        current_data = input_data
         
         try:
-            # Execute nodes in order (simplified - assumes linear flow)
-            for node in workflow.nodes:
-                if node.type not in self.node_registry:
-                    logger.warning(f"Unknown node type: {node.type}, skipping")
-                    continue
-                
-                # Create node instance
-                node_class = self.node_registry[node.type]
-                node_instance = node_class(node.id, node.type, node.parameters)
-                
-                # Execute node
-                logger.info(f"Executing node: {node.name} ({node.type})")
-                node_result = await node_instance.execute(current_data)
-                results[node.id] = node_result
-                current_data = node_result
+            levels, predecessors = self._compile(workflow)
+            
+            # Nodes within a level are independent, so run them concurrently
+            for level in levels:
+                for node, _ in level:
+                    logger.info(f"Executing node: {node.name} ({node.type})")
+                level_results = await asyncio.gather(*(
+                    node_instance.execute(
+                        self._node_input(node, predecessors, results, input_data)
+                    )
+                    for node, node_instance in level
+                ))
+                for (node, _), node_result in zip(level, level_results):
+                    results[node.id] = node_result
             
+            finished_at = datetime.now()
             workflow.status = WorkflowStatus.COMPLETED
-            workflow.last_executed = datetime.now()
+            workflow.last_executed = finished_at
             
-            execution_time = (datetime.now() - start_time).total_seconds()
+            execution_time = (finished_at - start_time).total_seconds()
             
             execution_record = {
                 'workflow_id': workflow_id,
@@ -258,7 +280,7 @@ class N8nWorkflowEngine:
                 'results': results
             }
             
-            self.execution_history.append(execution_record)
+            self._record_execution(execution_record)
             
             logger.info(f"Workflow {workflow.name} completed in {execution_time:.2f}s")
             
@@ -276,10 +298,105 @@ class N8nWorkflowEngine:
                 'error': str(e)
             }
             
-            self.execution_history.append(execution_record)
+            self._record_execution(execution_record)
             
             raise
     
+    def _compile(self, workflow: Workflow) -> tuple:
+        """Resolve node classes and dependency levels once per workflow
+        
+        The plan is cached on the workflow until its nodes, connections or
+        the node registry change.
+        """
+        if workflow._compiled is not None:
+            return workflow._compiled
+        
+        for node in workflow.nodes:
+            if node.type not in self.node_registry:
+                raise ValueError(f"Unknown node type: {node.type} (node {node.id})")
+        
+        levels, predecessors = self._plan_execution(workflow)
+        compiled_levels = [
+            [
+                (node, self.node_registry[node.type](node.id, node.type, node.parameters))
+                for node in level
+            ]
+            for level in levels
+        ]
+        
+        workflow._compiled = (compiled_levels, predecessors)
+        return workflow._compiled
+    
+    def _plan_execution(self, workflow: Workflow
+                        ) -> tuple[List[List[WorkflowNode]], Dict[str, List[str]]]:
+        """Group nodes into dependency levels using Kahn's algorithm
+        
+        Returns the levels in execution order and each node's predecessor
+        IDs. A workflow without connections runs as a linear chain in node
+        order.
+        """
+        if not workflow.connections:
+            levels = [[node] for node in workflow.nodes]
+            predecessors = {
+                node.id: [workflow.nodes[i - 1].id] if i > 0 else []
+                for i, node in enumerate(workflow.nodes)
+            }
+            return levels, predecessors
+        
+        nodes = {node.id: node for node in workflow.nodes}
+        in_degree = {node_id: 0 for node_id in nodes}
+        successors: Dict[str, List[str]] = defaultdict(list)
+        predecessors: Dict[str, List[str]] = defaultdict(list)
+        
+        for connection in workflow.connections:
+            for node_id in (connection.source_node, connection.target_node):
+                if node_id not in nodes:
+                    raise ValueError(f"Connection references unknown node {node_id}")
+            successors[connection.source_node].append(connection.target_node)
+            predecessors[connection.target_node].append(connection.source_node)
+            in_degree[connection.target_node] += 1
+        
+        levels = []
+        ready = [node.id for node in workflow.nodes if in_degree[node.id] == 0]
+        while ready:
+            levels.append([nodes[node_id] for node_id in ready])
+            next_ready = []
+            for node_id in ready:
+                for target in successors[node_id]:
+                    in_degree[target] -= 1
+                    if in_degree[target] == 0:
+                        next_ready.append(target)
+            ready = next_ready
+        
+        if sum(len(level) for level in levels) != len(nodes):
+            raise ValueError(f"Workflow {workflow.id} contains a cycle")
+        
+        return levels, predecessors
+    
+    @staticmethod
+    def _node_input(node: WorkflowNode, predecessors: Dict[str, List[str]],
+                    outputs: Dict[str, Any], input_data: Any) -> Any:
+        """Resolve a node's input from its predecessors' outputs"""
+        sources = predecessors.get(node.id)
+        if not sources:
+            return input_data
+        if len(sources) == 1:
+            return outputs[sources[0]]
+        return {source: outputs[source] for source in sources}
+    
+    def _record_execution(self, execution_record: Dict[str, Any]):
+        """Append an execution record to the global and per-workflow history"""
+        self.execution_history.append(execution_record)
+        self._history_by_wf[execution_record['workflow_id']].append(execution_record)
+        
+        if execution_record['status'] == 'completed':
+            self._stats['successful'] += 1
+            if 'execution_time' in execution_record:
+                self._stats['exec_time_sum'] += execution_record['execution_time']
+                self._stats['exec_time_count'] += 1
+        elif execution_record['status'] == 'failed':
+            self._stats['failed'] += 1
+    
     def get_workflow(self, workflow_id: str) -> Optional[Workflow]:
         """Get workflow by ID"""
         return self.workflows.get(workflow_id)
@@ -291,28 +408,19 @@ class N8nWorkflowEngine:
     def get_execution_history(self, workflow_id: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get execution history"""
         if workflow_id:
-            return [
-                record for record in self.execution_history 
-                if record['workflow_id'] == workflow_id
-            ]
+            return list(self._history_by_wf.get(workflow_id, ()))
         return self.execution_history
     
     def get_statistics(self) -> Dict[str, Any]:
         """Get workflow engine statistics"""
         total_executions = len(self.execution_history)
-        successful = sum(1 for r in self.execution_history if r['status'] == 'completed')
-        failed = sum(1 for r in self.execution_history if r['status'] == 'failed')
+        successful = self._stats['successful']
+        failed = self._stats['failed']
         
-        avg_execution_time = 0.0
-        if total_executions > 0:
-            completed_records = [
-                r for r in self.execution_history 
-                if r['status'] == 'completed' and 'execution_time' in r
-            ]
-            if completed_records:
-                avg_execution_time = sum(
-                    r['execution_time'] for r in completed_records
-                ) / len(completed_records)
+        avg_execution_time = (
+            self._stats['exec_time_sum'] / self._stats['exec_time_count']
+            if self._stats['exec_time_count'] > 0 else 0.0
+        )
         
         return {
             'total_workflows': len(self.workflows),
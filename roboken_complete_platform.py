@@ -8,16 +8,28 @@ License: MIT
 """
 
 import asyncio
+import functools
+import hashlib
+import itertools
 import json
 import logging
+import re
+import sys
 import time
+from collections import OrderedDict, deque
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, asdict
 from enum import Enum
 import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # Optional accelerator; fall back to the stdlib encoder
+    orjson = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -25,6 +37,72 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Slotted dataclasses drop the per-instance __dict__. dataclass only accepts
+# slots=True on Python 3.10+, and setup.py still declares 3.8 support, so
+# older interpreters get plain dataclasses. The other modules mirror this.
+_DATACLASS_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+# Intent keywords in priority order. Each branch looks ahead over the whole
+# command, so the first intent with a keyword anywhere wins; group names
+# are the intents.
+_INTENT_RE = re.compile(
+    r'(?=.*?(?P<open_application>open|launch))'
+    r'|(?=.*?(?P<search>search|find))'
+    r'|(?=.*?(?P<send_email>send|email))'
+    r'|(?=.*?(?P<download>download))'
+    r'|(?=.*?(?P<upload>upload))',
+    re.IGNORECASE | re.DOTALL
+)
+
+# Whitespace-delimited entity tokens; group names are the entity keys. A
+# token containing '@' is an email even if it starts with "http".
+_ENTITY_RE = re.compile(
+    r'(?<!\S)(?:'
+    r'(?P<browser>(?i:chrome|firefox|edge))(?!\S)'
+    r'|(?P<email>[^\s@]*@\S*)'
+    r'|(?P<url>http\S*)'
+    r')'
+)
+
+
+@functools.lru_cache(maxsize=1024)
+def _match_entities(command: str) -> tuple[tuple[str, str], ...]:
+    """Entity (key, token) pairs in command; later tokens override earlier ones"""
+    entities = {}
+    for match in _ENTITY_RE.finditer(command):
+        entities[match.lastgroup] = match.group()
+    return tuple(entities.items())
+
+
+def _json_dumps(obj: Any) -> str:
+    """Serialize a persisted task field to JSON text, via orjson when installed
+    
+    orjson is only used where it agrees with json.dumps; anything else goes
+    through json.dumps, so what can be persisted does not depend on orjson.
+    """
+    if orjson is not None:
+        try:
+            # Non-string keys are stringified, as json.dumps does. Datetimes,
+            # dataclasses and subclasses of builtins are passed through so
+            # they raise here instead of getting orjson's own encoding.
+            encoded = orjson.dumps(obj, option=(
+                orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+                | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_PASSTHROUGH_SUBCLASS
+            ))
+        except orjson.JSONEncodeError:
+            pass  # e.g. integers beyond 64 bits
+        else:
+            # orjson writes NaN and infinities as null; json.dumps keeps them
+            if b'null' not in encoded:
+                return encoded.decode()
+    return json.dumps(obj)
+
+
+def _ns_to_iso(ns: int) -> str:
+    """Format a time.time_ns() value as a local ISO-8601 timestamp"""
+    seconds, nanos = divmod(ns, 1_000_000_000)
+    return datetime.fromtimestamp(seconds).replace(microsecond=nanos // 1000).isoformat()
+
 
 class TaskType(Enum):
     """Types of tasks the simulator can handle"""
@@ -45,7 +123,41 @@ class TaskStatus(Enum):
     REQUIRES_APPROVAL = "requires_approval"
 
 
-@dataclass
+# Simulated latency and result fields for types without a dedicated profile
+_GENERAL_AUTOMATION_PROFILE = (0.08, {
+    'action': 'general_automation',
+    'result': 'Successfully completed automation',
+    'steps_executed': 2
+})
+
+# Simulated latency and result fields per task type. Every TaskType has an
+# entry, so dispatch is a plain subscript.
+_AUTOMATION_PROFILES: Dict[TaskType, tuple[float, Dict[str, Any]]] = {
+    **dict.fromkeys(TaskType, _GENERAL_AUTOMATION_PROFILE),
+    TaskType.WEB_AUTOMATION: (0.15, {
+        'action': 'web_navigation',
+        'result': 'Successfully completed web automation',
+        'steps_executed': 5
+    }),
+    TaskType.MOBILE_AUTOMATION: (0.12, {
+        'action': 'mobile_interaction',
+        'result': 'Successfully completed mobile automation',
+        'steps_executed': 4
+    }),
+    TaskType.DESKTOP_AUTOMATION: (0.10, {
+        'action': 'desktop_operation',
+        'result': 'Successfully completed desktop automation',
+        'steps_executed': 3
+    }),
+    TaskType.WORKFLOW_AUTOMATION: (0.20, {
+        'action': 'workflow_execution',
+        'result': 'Successfully completed workflow automation',
+        'integrations_used': ('gmail', 'slack', 'sheets')
+    }),
+}
+
+
+@dataclass(**_DATACLASS_OPTIONS)
 class Task:
     """Task data structure"""
     id: str
@@ -53,13 +165,13 @@ class Task:
     description: str
     parameters: Dict[str, Any]
     status: TaskStatus
-    created_at: datetime
-    completed_at: Optional[datetime] = None
+    created_at: int  # time.time_ns()
+    completed_at: Optional[int] = None  # time.time_ns()
     result: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class AutomationResult:
     """Result of automation execution"""
     success: bool
@@ -70,6 +182,28 @@ class AutomationResult:
     metadata: Optional[Dict[str, Any]] = None
 
 
+@dataclass(**_DATACLASS_OPTIONS)
+class ExecutionStats:
+    """Running counters for task execution, with derived rates kept current"""
+    total_tasks: int = 0
+    successful_tasks: int = 0
+    failed_tasks: int = 0
+    total_execution_time: float = 0.0
+    success_rate: float = 0.0
+    average_execution_time: float = 0.0
+    
+    def record(self, success: bool, execution_time: float = 0.0):
+        """Count one finished task and refresh the derived rates"""
+        self.total_tasks += 1
+        if success:
+            self.successful_tasks += 1
+            self.total_execution_time += execution_time
+        else:
+            self.failed_tasks += 1
+        self.success_rate = self.successful_tasks / self.total_tasks
+        self.average_execution_time = self.total_execution_time / self.total_tasks
+
+
 class AIModelInterface:
     """Interface for AI models (BERT, YOLOv5, MAML)"""
     
@@ -93,37 +227,25 @@ class AIModelInterface:
             'confidence': 0.95
         }
     
-    def _extract_intent(self, command: str) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def _extract_intent(command: str) -> str:
         """Extract intent from command"""
-        command_lower = command.lower()
-        if 'open' in command_lower or 'launch' in command_lower:
-            return 'open_application'
-        elif 'search' in command_lower or 'find' in command_lower:
-            return 'search'
-        elif 'send' in command_lower or 'email' in command_lower:
-            return 'send_email'
-        elif 'download' in command_lower:
-            return 'download'
-        elif 'upload' in command_lower:
-            return 'upload'
-        else:
-            return 'general_automation'
+        match = _INTENT_RE.match(command)
+        return match.lastgroup if match else 'general_automation'
     
-    def _extract_entities(self, command: str) -> Dict[str, str]:
+    @staticmethod
+    def _extract_entities(command: str) -> Dict[str, str]:
         """Extract entities from command"""
-        # Simple entity extraction
-        entities = {}
-        words = command.split()
-        
-        for i, word in enumerate(words):
-            if word.lower() in ['chrome', 'firefox', 'edge']:
-                entities['browser'] = word
-            elif '@' in word:
-                entities['email'] = word
-            elif word.startswith('http'):
-                entities['url'] = word
+        # Cached as immutable pairs; callers get their own dict
+        return dict(_match_entities(command))
+    
+    def extract_entities_batch(self, commands: List[str]) -> List[Dict[str, str]]:
+        """Extract entities from many commands at once
         
-        return entities
+        Repeated commands in the batch are resolved from the entity cache.
+        """
+        return [dict(_match_entities(command)) for command in commands]
     
     async def analyze_screen(self, screen_data: bytes) -> Dict[str, Any]:
         """Analyze screen using YOLOv5"""
@@ -151,47 +273,39 @@ class AIModelInterface:
 class TaskExecutor:
     """Executes automation tasks"""
     
-    def __init__(self, ai_interface: AIModelInterface):
+    def __init__(self, ai_interface: AIModelInterface, nl_cache_size: int = 1024,
+                 nl_cache_path: Optional[str] = None):
         self.ai = ai_interface
-        self.execution_stats = {
-            'total_tasks': 0,
-            'successful_tasks': 0,
-            'failed_tasks': 0,
-            'total_execution_time': 0.0
-        }
+        self.execution_stats = ExecutionStats()
+        
+        # LRU of NL results keyed by a digest of the task description
+        self.nl_cache_size = nl_cache_size
+        self.nl_cache_path = Path(nl_cache_path) if nl_cache_path else None
+        self._nl_cache: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+        if self.nl_cache_path and self.nl_cache_path.exists():
+            self._load_nl_cache()
     
     async def execute_task(self, task: Task) -> AutomationResult:
         """Execute a task based on its type"""
-        start_time = time.time()
+        start_time = time.perf_counter()
         logger.info(f"Executing task {task.id}: {task.description}")
         
         try:
             task.status = TaskStatus.RUNNING
             
             # Process command with AI
-            nl_result = await self.ai.process_natural_language(task.description)
+            nl_result = await self._process_description(task.description)
             
-            # Route to appropriate executor
-            if task.type == TaskType.WEB_AUTOMATION:
-                result = await self._execute_web_automation(task, nl_result)
-            elif task.type == TaskType.MOBILE_AUTOMATION:
-                result = await self._execute_mobile_automation(task, nl_result)
-            elif task.type == TaskType.DESKTOP_AUTOMATION:
-                result = await self._execute_desktop_automation(task, nl_result)
-            elif task.type == TaskType.WORKFLOW_AUTOMATION:
-                result = await self._execute_workflow_automation(task, nl_result)
-            else:
-                result = await self._execute_general_automation(task, nl_result)
+            # Run the automation for the task's type
+            result = await self._execute_automation(task, nl_result)
             
-            execution_time = time.time() - start_time
+            execution_time = time.perf_counter() - start_time
             task.status = TaskStatus.COMPLETED
-            task.completed_at = datetime.now()
+            task.completed_at = time.time_ns()
             task.result = result
             
             # Update stats
-            self.execution_stats['total_tasks'] += 1
-            self.execution_stats['successful_tasks'] += 1
-            self.execution_stats['total_execution_time'] += execution_time
+            self.execution_stats.record(True, execution_time)
             
             return AutomationResult(
                 success=True,
@@ -202,12 +316,11 @@ class TaskExecutor:
             )
             
         except Exception as e:
-            execution_time = time.time() - start_time
+            execution_time = time.perf_counter() - start_time
             task.status = TaskStatus.FAILED
             task.error = str(e)
             
-            self.execution_stats['total_tasks'] += 1
-            self.execution_stats['failed_tasks'] += 1
+            self.execution_stats.record(False)
             
             logger.error(f"Task {task.id} failed: {e}")
             
@@ -219,89 +332,110 @@ class TaskExecutor:
                 error=str(e)
             )
     
-    async def _execute_web_automation(self, task: Task, nl_result: Dict) -> Dict:
-        """Execute web automation task"""
-        await asyncio.sleep(0.15)  # Simulate web interaction
-        return {
-            'action': 'web_navigation',
-            'intent': nl_result['intent'],
-            'result': 'Successfully completed web automation',
-            'steps_executed': 5
-        }
-    
-    async def _execute_mobile_automation(self, task: Task, nl_result: Dict) -> Dict:
-        """Execute mobile automation task"""
-        await asyncio.sleep(0.12)
-        return {
-            'action': 'mobile_interaction',
-            'intent': nl_result['intent'],
-            'result': 'Successfully completed mobile automation',
-            'steps_executed': 4
-        }
+    async def _process_description(self, description: str) -> Dict[str, Any]:
+        """Process a task description, reusing cached results for repeats"""
+        key = hashlib.blake2b(description.encode(), digest_size=16).hexdigest()
+        nl_result = self._nl_cache.get(key)
+        if nl_result is not None:
+            self._nl_cache.move_to_end(key)
+            return nl_result
+        
+        nl_result = await self.ai.process_natural_language(description)
+        self._nl_cache[key] = nl_result
+        if len(self._nl_cache) > self.nl_cache_size:
+            self._nl_cache.popitem(last=False)
+        return nl_result
     
-    async def _execute_desktop_automation(self, task: Task, nl_result: Dict) -> Dict:
-        """Execute desktop automation task"""
-        await asyncio.sleep(0.10)
-        return {
-            'action': 'desktop_operation',
-            'intent': nl_result['intent'],
-            'result': 'Successfully completed desktop automation',
-            'steps_executed': 3
-        }
+    def _load_nl_cache(self):
+        """Load persisted NL results"""
+        try:
+            entries = json.loads(self.nl_cache_path.read_text(encoding='utf-8'))
+            if not isinstance(entries, list) or not all(
+                isinstance(entry, list) and len(entry) == 2
+                and isinstance(entry[0], str) and isinstance(entry[1], dict)
+                for entry in entries
+            ):
+                raise ValueError("expected a list of [key, result] pairs")
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable NL cache {self.nl_cache_path}: {e}")
+            return
+        # Keep only the newest entries that fit; a zero size loads none
+        for key, nl_result in entries[max(len(entries) - self.nl_cache_size, 0):]:
+            self._nl_cache[key] = nl_result
+        logger.info(f"Loaded {len(self._nl_cache)} cached NL results")
     
-    async def _execute_workflow_automation(self, task: Task, nl_result: Dict) -> Dict:
-        """Execute workflow automation via n8n"""
-        await asyncio.sleep(0.20)
-        return {
-            'action': 'workflow_execution',
-            'workflow_id': 'wf_' + task.id[:8],
-            'result': 'Successfully completed workflow automation',
-            'integrations_used': ['gmail', 'slack', 'sheets']
-        }
+    def save_nl_cache(self):
+        """Persist NL results, oldest first, if a cache path is configured"""
+        if not self.nl_cache_path:
+            return
+        self.nl_cache_path.parent.mkdir(parents=True, exist_ok=True)
+        self.nl_cache_path.write_text(
+            json.dumps(list(self._nl_cache.items())), encoding='utf-8'
+        )
     
-    async def _execute_general_automation(self, task: Task, nl_result: Dict) -> Dict:
-        """Execute general automation task"""
-        await asyncio.sleep(0.08)
-        return {
-            'action': 'general_automation',
-            'intent': nl_result['intent'],
-            'result': 'Successfully completed automation',
-            'steps_executed': 2
-        }
+    async def _execute_automation(self, task: Task, nl_result: Dict) -> Dict:
+        """Execute an automation task from its type's profile"""
+        delay, template = _AUTOMATION_PROFILES[task.type]
+        await asyncio.sleep(delay)  # Simulate the interaction
+        
+        result = {**template, 'intent': nl_result['intent']}
+        if task.type is TaskType.WORKFLOW_AUTOMATION:
+            result['workflow_id'] = 'wf_' + task.id[:8]
+        return result
     
     def get_stats(self) -> Dict[str, Any]:
         """Get execution statistics"""
-        success_rate = (
-            self.execution_stats['successful_tasks'] / self.execution_stats['total_tasks']
-            if self.execution_stats['total_tasks'] > 0 else 0
-        )
-        avg_execution_time = (
-            self.execution_stats['total_execution_time'] / self.execution_stats['total_tasks']
-            if self.execution_stats['total_tasks'] > 0 else 0
-        )
-        
+        stats = self.execution_stats
         return {
-            **self.execution_stats,
-            'success_rate': success_rate,
-            'average_execution_time': avg_execution_time
+            'total_tasks': stats.total_tasks,
+            'successful_tasks': stats.successful_tasks,
+            'failed_tasks': stats.failed_tasks,
+            'total_execution_time': stats.total_execution_time,
+            'success_rate': stats.success_rate,
+            'average_execution_time': stats.average_execution_time
         }
 
 
 class RoboKenSimulator:
     """Main RoboKen Simulator Platform"""
     
-    def __init__(self, db_path: str = "roboken.db"):
+    _INSERT_TASK_SQL = 'INSERT INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)'
+    _UPSERT_TASK_SQL = 'INSERT OR REPLACE INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)'
+    
+    def __init__(self, db_path: str = "roboken.db", nl_cache_path: Optional[str] = None):
         self.db_path = db_path
         self.ai_interface = AIModelInterface()
-        self.executor = TaskExecutor(self.ai_interface)
-        self.task_queue: List[Task] = []
+        self.executor = TaskExecutor(self.ai_interface, nl_cache_path=nl_cache_path)
+        self.task_queue: deque[Task] = deque()
+        # Task ID sequence, seeded from the clock in microseconds so IDs
+        # also stay unique across restarts against the same database
+        self._task_ids = itertools.count(time.time_ns() // 1000)
+        # One connection for the simulator's lifetime; autocommit mode
+        self._conn = sqlite3.connect(
+            self.db_path, isolation_level=None, check_same_thread=False
+        )
+        # Every statement runs on the DB thread, so one cursor is reused
+        self._cur = self._conn.cursor()
+        # All database calls after init run on this single thread, which
+        # keeps them off the event loop and serialized on the connection
+        self._db_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix='roboken-db'
+        )
         self._init_database()
         logger.info("RoboKen Simulator initialized")
     
     def _init_database(self):
         """Initialize SQLite database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self._cur
+        
+        for pragma in (
+            'journal_mode=WAL',
+            'synchronous=NORMAL',
+            'temp_store=MEMORY',
+            'cache_size=-64000',
+            'busy_timeout=5000',
+        ):
+            cursor.execute(f'PRAGMA {pragma}')
         
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS tasks (
@@ -328,89 +462,146 @@ class RoboKenSimulator:
             )
         ''')
         
-        conn.commit()
-        conn.close()
         logger.info("Database initialized")
     
+    def _next_task_id(self) -> str:
+        """Allocate a unique task ID"""
+        return f"task_{next(self._task_ids):016x}"
+    
     async def submit_task(self, description: str, task_type: TaskType, 
                          parameters: Optional[Dict] = None) -> Task:
         """Submit a new task for execution"""
         task = Task(
-            id=f"task_{int(time.time() * 1000)}",
+            id=self._next_task_id(),
             type=task_type,
             description=description,
             parameters=parameters or {},
             status=TaskStatus.PENDING,
-            created_at=datetime.now()
+            created_at=time.time_ns()
         )
         
         self.task_queue.append(task)
-        self._save_task(task)
+        await self._save_task(task)
         logger.info(f"Task submitted: {task.id}")
         
         return task
     
+    async def submit_tasks(self, tasks: List[tuple]) -> List[Task]:
+        """Submit many tasks at once
+        
+        Each item is (description, task_type) or (description, task_type,
+        parameters). All rows are inserted in a single transaction.
+        """
+        created_at = time.time_ns()
+        submitted = []
+        for description, task_type, *rest in tasks:
+            parameters = rest[0] if rest else None
+            submitted.append(Task(
+                id=self._next_task_id(),
+                type=task_type,
+                description=description,
+                parameters=parameters or {},
+                status=TaskStatus.PENDING,
+                created_at=created_at
+            ))
+        
+        rows = [self._task_row(task) for task in submitted]
+        await self._run_db(self._write_rows, self._INSERT_TASK_SQL, rows)
+        
+        self.task_queue.extend(submitted)
+        logger.info(f"Tasks submitted: {len(submitted)}")
+        
+        return submitted
+    
     async def execute_next_task(self) -> Optional[AutomationResult]:
         """Execute the next task in the queue"""
         if not self.task_queue:
             return None
         
-        task = self.task_queue.pop(0)
+        task = self.task_queue.popleft()
         result = await self.executor.execute_task(task)
-        self._update_task(task)
+        await self._update_task(task)
         
         return result
     
-    async def execute_all_tasks(self) -> List[AutomationResult]:
-        """Execute all tasks in the queue"""
-        results = []
-        while self.task_queue:
-            result = await self.execute_next_task()
-            if result:
-                results.append(result)
-        return results
+    async def execute_all_tasks(self, max_workers: int = 4) -> List[AutomationResult]:
+        """Execute all tasks in the queue
+        
+        Up to max_workers tasks run concurrently; results are returned in
+        queue order.
+        """
+        results: Dict[int, AutomationResult] = {}
+        executed: List[Task] = []
+        positions = itertools.count()
+        
+        async def worker():
+            while self.task_queue:
+                position = next(positions)
+                task = self.task_queue.popleft()
+                results[position] = await self.executor.execute_task(task)
+                executed.append(task)
+        
+        try:
+            await asyncio.gather(*(worker() for _ in range(max_workers)))
+        finally:
+            # Final task states are written in one batch
+            if executed:
+                await self._bulk_persist(executed)
+        return [results[position] for position in sorted(results)]
+    
+    async def _run_db(self, func, *args):
+        """Run a blocking database call on the database thread"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._db_executor, func, *args)
     
-    def _save_task(self, task: Task):
-        """Save task to database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def _write_rows(self, sql: str, rows: List[tuple]):
+        """Write many rows in one transaction; runs on the database thread
         
-        cursor.execute('''
-            INSERT INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+        BEGIN through COMMIT happen in this one call, so the single DB
+        thread never interleaves another statement into the transaction.
+        """
+        cursor = self._cur
+        cursor.execute('BEGIN')
+        try:
+            cursor.executemany(sql, rows)
+        except BaseException:
+            cursor.execute('ROLLBACK')
+            raise
+        cursor.execute('COMMIT')
+    
+    @staticmethod
+    def _task_row(task: Task) -> tuple:
+        """Column values for a tasks row"""
+        return (
             task.id,
             task.type.value,
             task.description,
-            json.dumps(task.parameters),
+            _json_dumps(task.parameters),
             task.status.value,
-            task.created_at.isoformat(),
-            task.completed_at.isoformat() if task.completed_at else None,
-            json.dumps(task.result) if task.result else None,
+            _ns_to_iso(task.created_at),
+            _ns_to_iso(task.completed_at) if task.completed_at else None,
+            _json_dumps(task.result) if task.result else None,
             task.error
-        ))
-        
-        conn.commit()
-        conn.close()
+        )
     
-    def _update_task(self, task: Task):
+    async def _save_task(self, task: Task):
+        """Save task to database"""
+        await self._run_db(self._cur.execute, self._INSERT_TASK_SQL, self._task_row(task))
+    
+    async def _update_task(self, task: Task):
         """Update task in database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            UPDATE tasks 
-            SET status = ?, completed_at = ?, result = ?, error = ?
-            WHERE id = ?
-        ''', (
-            task.status.value,
-            task.completed_at.isoformat() if task.completed_at else None,
-            json.dumps(task.result) if task.result else None,
-            task.error,
-            task.id
-        ))
-        
-        conn.commit()
-        conn.close()
+        await self._run_db(self._cur.execute, self._UPSERT_TASK_SQL, self._task_row(task))
+    
+    async def _bulk_persist(self, tasks: List[Task]):
+        """Upsert many tasks in a single transaction"""
+        rows = [self._task_row(task) for task in tasks]
+        await self._run_db(self._write_rows, self._UPSERT_TASK_SQL, rows)
+    
+    def close(self):
+        """Save the NL cache and close the database connection"""
+        self.executor.save_nl_cache()
+        self._db_executor.shutdown(wait=True)
+        self._conn.close()
     
     def get_statistics(self) -> Dict[str, Any]:
         """Get platform statistics"""
@@ -462,6 +653,8 @@ async def main():
     print(json.dumps(stats, indent=2))
     print(f"\nSuccess Rate: {stats['executor_stats']['success_rate']*100:.1f}%")
     print(f"Average Execution Time: {stats['executor_stats']['average_execution_time']:.3f}s")
+    
+    simulator.close()
 
 
 if __name__ == "__main__":
@@ -1,15 +1,82 @@
+import asyncio
 import boto3
+import copy
+import functools
 import os
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor
 from botocore.exceptions import ClientError
 
+# Seconds a fetched secret is served from memory before re-fetching
+DEFAULT_SECRET_TTL = 300
+
+
+# API key name -> secret name template, formatted with the environment
+API_KEY_SECRETS = {
+    'google_maps': 'api/google-maps/robocane-{environment}',
+    'stripe_publishable': 'api/stripe-publishable/robocane-{environment}',
+    'stripe_secret': 'api/stripe-secret/robocane-{environment}',
+    'openai': 'api/openai/robocane-{environment}',
+    'anthropic': 'api/anthropic/robocane-{environment}',
+    'serp_api': 'api/serp-api/robocane-{environment}',
+    'n8n': 'api/n8n.cloud/robocane-{environment}',
+}
+
+
+@functools.lru_cache(maxsize=1)
+def _get_client():
+    """Process-wide Secrets Manager client, created on first use
+    
+    Built from a dedicated session rather than boto3's implicit default
+    session, so it does not depend on or mutate global boto3 state.
+    """
+    session = boto3.session.Session()
+    return session.client('secretsmanager', region_name='ap-northeast-1')
+
+
 class SecretsManager:
-    def __init__(self):
-        self.client = boto3.client('secretsmanager', region_name='ap-northeast-1')
+    def __init__(self, ttl=DEFAULT_SECRET_TTL):
         # Get environment from environment variable (demo, stg, or prod)
         self.environment = os.environ.get('ENVIRONMENT', 'demo')
-        
+        self.ttl = ttl
+        # secret_name -> (value, expires_at on the monotonic clock)
+        self._cache = {}
+    
+    @property
+    def client(self):
+        """Shared boto3 Secrets Manager client"""
+        return _get_client()
+    
     def get_secret(self, secret_name):
+        """Retrieve a secret, served from the TTL cache when fresh
+        
+        Parsed JSON secrets are returned as copies, so callers cannot
+        change the cached value seen by later callers.
+        """
+        if self._is_cached(secret_name):
+            secret = self._cache[secret_name][0]
+        else:
+            secret = self._fetch_secret(secret_name)
+            self._cache[secret_name] = (secret, time.monotonic() + self.ttl)
+        
+        if isinstance(secret, (dict, list)):
+            return copy.deepcopy(secret)
+        return secret
+    
+    def _is_cached(self, secret_name):
+        """Whether a secret is cached and not yet expired"""
+        cached = self._cache.get(secret_name)
+        return cached is not None and cached[1] > time.monotonic()
+    
+    def invalidate(self, secret_name=None):
+        """Drop one cached secret, or all of them"""
+        if secret_name is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(secret_name, None)
+    
+    def _fetch_secret(self, secret_name):
         """Retrieve a secret from AWS Secrets Manager"""
         try:
             response = self.client.get_secret_value(SecretId=secret_name)
@@ -28,43 +95,83 @@ class SecretsManager:
             print(f"Error retrieving secret {secret_name}: {e}")
             raise
     
+    def _api_key_secret_name(self, key, environment=None):
+        """Secret name for an API key in an environment (default: current)"""
+        return API_KEY_SECRETS[key].format(environment=environment or self.environment)
+    
+    def get_api_keys(self, environment=None):
+        """Get every API key for an environment, fetching misses concurrently"""
+        secret_names = {
+            key: self._api_key_secret_name(key, environment) for key in API_KEY_SECRETS
+        }
+        missing = [name for name in secret_names.values() if not self._is_cached(name)]
+        fetched = {}
+        if missing:
+            # Build the shared client before fanning out to worker threads
+            _get_client()
+            with ThreadPoolExecutor(max_workers=len(missing)) as pool:
+                fetched = dict(zip(missing, pool.map(self.get_secret, missing)))
+        # Only names that were cached before the fan-out are read again
+        return {
+            key: fetched[name] if name in fetched else self.get_secret(name)
+            for key, name in secret_names.items()
+        }
+    
+    async def get_api_keys_async(self, environment=None):
+        """Get every API key for an environment without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        secret_names = {
+            key: self._api_key_secret_name(key, environment) for key in API_KEY_SECRETS
+        }
+        missing = [name for name in secret_names.values() if not self._is_cached(name)]
+        fetched = {}
+        if missing:
+            _get_client()
+            fetched = dict(zip(missing, await asyncio.gather(*(
+                loop.run_in_executor(None, self.get_secret, name) for name in missing
+            ))))
+        return {
+            key: fetched[name] if name in fetched else self.get_secret(name)
+            for key, name in secret_names.items()
+        }
+    
     def get_google_maps_api_key(self):
         """Get Google Maps API key for current environment"""
-        secret_name = f"api/google-maps/robocane-{self.environment}"
-        return self.get_secret(secret_name)
+        return self.get_secret(self._api_key_secret_name('google_maps'))
     
     def get_stripe_publishable_key(self):
         """Get Stripe publishable key for current environment"""
-        secret_name = f"api/stripe-publishable/robocane-{self.environment}"
-        return self.get_secret(secret_name)
+        return self.get_secret(self._api_key_secret_name('stripe_publishable'))
     
     def get_stripe_secret_key(self):
         """Get Stripe secret key for current environment"""
-        secret_name = f"api/stripe-secret/robocane-{self.environment}"
-        return self.get_secret(secret_name)
+        return self.get_secret(self._api_key_secret_name('stripe_secret'))
     
     def get_openai_api_key(self):
         """Get OpenAI API key for current environment"""
-        secret_name = f"api/openai/robocane-{self.environment}"
-        return self.get_secret(secret_name)
+        return self.get_secret(self._api_key_secret_name('openai'))
     
     def get_anthropic_api_key(self):
         """Get Anthropic API key for current environment"""
-        secret_name = f"api/anthropic/robocane-{self.environment}"
-        return self.get_secret(secret_name)
+        return self.get_secret(self._api_key_secret_name('anthropic'))
     
     def get_serp_api_key(self):
         """Get SerpAPI key for current environment"""
-        secret_name = f"api/serp-api/robocane-{self.environment}"
-        return self.get_secret(secret_name)
+        return self.get_secret(self._api_key_secret_name('serp_api'))
     
     def get_n8n_api_key(self):
         """Get n8n API key for current environment"""
-        secret_name = f"api/n8n.cloud/robocane-{self.environment}"
-        return self.get_secret(secret_name)
+        return self.get_secret(self._api_key_secret_name('n8n'))
+
+
+@functools.lru_cache(maxsize=1)
+def get_secrets_manager():
+    """Process-wide SecretsManager shared by all callers"""
+    return SecretsManager()
+
 
 # Create a global instance
-secrets_manager = SecretsManager()
+secrets_manager = get_secrets_manager()
             
         
            
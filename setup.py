@@ -2,7 +2,7 @@
 RoboKen Simulator - Setup Script
 """
 
-from setuptools import setup, find_packages
+from setuptools import setup
 from pathlib import Path
 
 # Read README
@@ -13,11 +13,10 @@ long_description = readme_file.read_text(encoding="utf-8") if readme_file.exists
 requirements_file = Path(__file__).parent / "requirements.txt"
 requirements = []
 if requirements_file.exists():
-    with open(requirements_file, 'r', encoding='utf-8') as f:
-        requirements = [
-            line.strip() for line in f 
-            if line.strip() and not line.startswith('#')
-        ]
+    requirements = [
+        line for line in map(str.strip, requirements_file.read_text(encoding="utf-8").splitlines())
+        if line and not line.startswith('#')
+    ]
 
 setup(
     name="roboken-simulator",
@@ -33,7 +32,14 @@ setup(
         "Documentation": "https://docs.roboken.ai",
         "Source Code": "https://github.com/robokenjp/roboken-simulator",
     },
-    packages=find_packages(exclude=["tests", "tests.*", "docs"]),
+    # The simulator ships as flat top-level modules, so list them directly
+    # instead of having find_packages walk the tree for packages
+    py_modules=[
+        "error_handling_validation",
+        "n8n_integration",
+        "roboken_complete_platform",
+        "secrets_manager",
+    ],
     classifiers=[
         "Development Status :: 4 - Beta",
         "Intended Audience :: Developers",
@@ -4,10 +4,20 @@ RoboKen Simulator - Comprehensive Test Suite
 
 import pytest
 import asyncio
+import importlib
+import importlib.util
+import json
+import math
+import sys
+import types
+from datetime import datetime
 from roboken_complete_platform import (
-    RoboKenSimulator, TaskType, TaskStatus, AutomationResult
+    RoboKenSimulator, TaskType, TaskStatus, AutomationResult, AIModelInterface,
+    TaskExecutor, _json_dumps
+)
+from error_handling_validation import (
+    ErrorHandler, ErrorCategory, InputValidator, RetryStrategy, FallbackStrategy
 )
-from error_handling_validation import ErrorHandler, ErrorCategory, InputValidator
 from n8n_integration import N8nWorkflowEngine
 
 
@@ -17,7 +27,9 @@ class TestRoboKenSimulator:
     @pytest.fixture
     def simulator(self):
         """Create simulator instance for testing"""
-        return RoboKenSimulator(db_path=":memory:")
+        simulator = RoboKenSimulator(db_path=":memory:")
+        yield simulator
+        simulator.close()
     
     @pytest.mark.asyncio
     async def test_submit_task(self, simulator):
@@ -84,6 +96,104 @@ class TestRoboKenSimulator:
         assert len(results) == 3
         assert all(r.success for r in results)
     
+    @pytest.mark.asyncio
+    async def test_rapid_submissions_get_increasing_ids(self, simulator):
+        """Test task IDs stay unique and ordered under rapid submission"""
+        tasks = [
+            await simulator.submit_task(f"Task {i}", TaskType.WEB_AUTOMATION)
+            for i in range(50)
+        ]
+        ids = [task.id for task in tasks]
+        
+        assert len(set(ids)) == len(ids)
+        assert ids == sorted(ids)
+    
+    @pytest.mark.asyncio
+    async def test_submit_tasks_bulk(self, simulator):
+        """Test bulk submission assigns unique IDs and queues every task"""
+        tasks = await simulator.submit_tasks([
+            ("Task 1", TaskType.WEB_AUTOMATION),
+            ("Task 2", TaskType.MOBILE_AUTOMATION, {'app': 'mail'}),
+        ])
+        
+        assert len({task.id for task in tasks}) == 2
+        assert tasks[1].parameters == {'app': 'mail'}
+        assert len(simulator.task_queue) == 2
+    
+    @pytest.mark.asyncio
+    async def test_parameters_outside_orjson_range_persist(self, simulator):
+        """Test parameters orjson cannot encode fall back to json.dumps"""
+        task = await simulator.submit_task(
+            "Big numbers", TaskType.DATA_PROCESSING, {'n': 2**70, 'ratio': float('nan')}
+        )
+        
+        stored = simulator._conn.execute(
+            "SELECT parameters FROM tasks WHERE id = ?", (task.id,)
+        ).fetchone()[0]
+        parameters = json.loads(stored)
+        assert parameters['n'] == 2**70
+        assert math.isnan(parameters['ratio'])
+    
+    def test_json_dumps_rejects_what_json_rejects(self):
+        """Test persistable values do not depend on orjson being installed"""
+        with pytest.raises(TypeError):
+            _json_dumps({'when': datetime.now()})
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_bulk_submits(self, simulator):
+        """Test concurrent bulk submissions each commit their own rows"""
+        first, second = await asyncio.gather(
+            simulator.submit_tasks([("Task 1", TaskType.WEB_AUTOMATION)] * 3),
+            simulator.submit_tasks([("Task 2", TaskType.MOBILE_AUTOMATION)] * 2),
+        )
+        
+        count = simulator._conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+        assert (len(first), len(second)) == (3, 2)
+        assert count == 5
+    
+    @pytest.mark.asyncio
+    async def test_repeated_description_uses_nl_cache(self, simulator, tmp_path):
+        """Test repeated descriptions skip NL processing and persist"""
+        calls = []
+        original = simulator.ai_interface.process_natural_language
+        
+        async def counting(command):
+            calls.append(command)
+            return await original(command)
+        
+        simulator.ai_interface.process_natural_language = counting
+        simulator.executor.nl_cache_path = tmp_path / "nl_cache.json"
+        for _ in range(2):
+            await simulator.submit_task("Open Chrome", TaskType.WEB_AUTOMATION)
+            await simulator.execute_next_task()
+        simulator.close()
+        
+        reloaded = TaskExecutor(AIModelInterface(), nl_cache_path=tmp_path / "nl_cache.json")
+        
+        assert calls == ["Open Chrome"]
+        assert list(reloaded._nl_cache.values()) == list(simulator.executor._nl_cache.values())
+    
+    @pytest.mark.parametrize("content", ['{"a": 1}', '[[1, 2, 3]]', '[["key", "result"]]', 'not json'])
+    def test_malformed_nl_cache_is_ignored(self, tmp_path, content):
+        """Test a malformed NL cache file is ignored instead of raising"""
+        cache_file = tmp_path / "nl_cache.json"
+        cache_file.write_text(content)
+        
+        executor = TaskExecutor(AIModelInterface(), nl_cache_path=cache_file)
+        
+        assert len(executor._nl_cache) == 0
+    
+    def test_zero_size_nl_cache_loads_nothing(self, tmp_path):
+        """Test nl_cache_size=0 does not load the whole cache file"""
+        cache_file = tmp_path / "nl_cache.json"
+        cache_file.write_text('[["a", {"intent": "search"}], ["b", {"intent": "search"}]]')
+        
+        empty = TaskExecutor(AIModelInterface(), nl_cache_size=0, nl_cache_path=cache_file)
+        newest = TaskExecutor(AIModelInterface(), nl_cache_size=1, nl_cache_path=cache_file)
+        
+        assert len(empty._nl_cache) == 0
+        assert list(newest._nl_cache) == ["b"]
+    
     def test_get_statistics(self, simulator):
         """Test statistics retrieval"""
         stats = simulator.get_statistics()
@@ -91,6 +201,63 @@ class TestRoboKenSimulator:
         assert 'executor_stats' in stats
         assert 'queue_length' in stats
         assert 'timestamp' in stats
+    
+    @pytest.mark.asyncio
+    async def test_statistics_after_execution(self, simulator):
+        """Test derived execution statistics are kept current"""
+        await simulator.submit_task("Task 1", TaskType.WEB_AUTOMATION)
+        await simulator.execute_all_tasks()
+        
+        stats = simulator.get_statistics()['executor_stats']
+        
+        assert stats['total_tasks'] == 1
+        assert stats['success_rate'] == 1.0
+        assert stats['average_execution_time'] == stats['total_execution_time']
+
+
+class TestAIModelInterface:
+    """Test suite for AI Model Interface"""
+    
+    @pytest.fixture
+    def ai(self):
+        """Create AI interface instance"""
+        return AIModelInterface()
+    
+    def test_extract_intent_priority(self, ai):
+        """Test earlier intents win regardless of keyword position"""
+        assert ai._extract_intent("Search docs then LAUNCH editor") == 'open_application'
+        assert ai._extract_intent("Download and upload files") == 'download'
+    
+    def test_extract_intent_default(self, ai):
+        """Test commands without keywords fall back to general automation"""
+        assert ai._extract_intent("Process spreadsheet") == 'general_automation'
+    
+    def test_extract_entities(self, ai):
+        """Test browser, email and URL tokens are extracted"""
+        entities = ai._extract_entities(
+            "Open FIREFOX at https://example.com and mail bob@example.com"
+        )
+        
+        assert entities == {
+            'browser': 'FIREFOX',
+            'url': 'https://example.com',
+            'email': 'bob@example.com'
+        }
+    
+    def test_extract_entities_cached_copy(self, ai):
+        """Test cached entity results are not shared between callers"""
+        first = ai._extract_entities("Open chrome")
+        first['browser'] = 'mutated'
+        
+        assert ai._extract_entities("Open chrome") == {'browser': 'chrome'}
+    
+    def test_extract_entities_batch(self, ai):
+        """Test batch extraction matches single-command extraction"""
+        commands = ["Open chrome", "Mail a@b.com", "Open chrome", "Nothing here"]
+        
+        assert ai.extract_entities_batch(commands) == [
+            ai._extract_entities(command) for command in commands
+        ]
 
 
 class TestErrorHandler:
@@ -118,6 +285,41 @@ class TestErrorHandler:
         
         assert context.category == ErrorCategory.VALIDATION
     
+    @pytest.mark.asyncio
+    async def test_stack_trace_formatted_on_demand(self, error_handler):
+        """Test the traceback is kept raw and formatted lazily"""
+        try:
+            raise ValueError("Invalid input format")
+        except ValueError as e:
+            context = await error_handler.handle_error(e)
+        
+        assert context.stack_trace is not None
+        assert 'test_stack_trace_formatted_on_demand' in context.formatted_stack_trace
+    
+    @pytest.mark.asyncio
+    async def test_stack_trace_absent_for_unraised_error(self, error_handler):
+        """Test errors handled without being raised carry no stack trace"""
+        context = await error_handler.handle_error(ValueError("Invalid input format"))
+        
+        assert context.stack_trace is None
+        assert context.formatted_stack_trace is None
+    
+    @pytest.mark.asyncio
+    async def test_classify_timeout_error_by_type(self, error_handler):
+        """Test typed exceptions classify without message keywords"""
+        error = TimeoutError("Operation timed out")
+        context = await error_handler.handle_error(error)
+        
+        assert context.category == ErrorCategory.TIMEOUT
+    
+    def test_classify_keyword_priority(self, error_handler):
+        """Test earlier categories win when several keywords match"""
+        category, _ = error_handler.classify_error(
+            Exception("Invalid CONNECTION settings")
+        )
+        
+        assert category == ErrorCategory.NETWORK
+    
     def test_error_statistics(self, error_handler):
         """Test error statistics"""
         stats = error_handler.get_error_statistics()
@@ -125,6 +327,49 @@ class TestErrorHandler:
         assert 'total_errors' in stats
         assert 'by_category' in stats
         assert 'by_severity' in stats
+    
+    @pytest.mark.asyncio
+    async def test_error_statistics_survive_log_rotation(self):
+        """Test statistics keep counting after the log is trimmed"""
+        handler = ErrorHandler(max_log_size=2)
+        for _ in range(3):
+            await handler.handle_error(ValueError("Invalid input format"))
+        
+        stats = handler.get_error_statistics()
+        
+        assert len(handler.error_log) == 2
+        assert stats['total_errors'] == 3
+        assert stats['by_category'] == {'validation': 3}
+    
+    @pytest.mark.asyncio
+    async def test_fallback_recovery(self, error_handler):
+        """Test non-retry strategies recover through the shared signature"""
+        calls = []
+        
+        async def fallback():
+            calls.append('fallback')
+        
+        async def operation():
+            calls.append('operation')
+        
+        error_handler.register_recovery_strategy(
+            ErrorCategory.VALIDATION, FallbackStrategy(fallback)
+        )
+        context = await error_handler.handle_error(
+            ValueError("Invalid input format"), operation=operation
+        )
+        
+        assert context.recovery_successful is True
+        assert calls == ['fallback']
+        assert error_handler.get_error_statistics()['recovery_rate'] == 1.0
+    
+    def test_retry_delay_capped(self):
+        """Test retry backoff never exceeds max_delay"""
+        strategy = RetryStrategy(max_retries=10, base_delay=1.0, max_delay=5.0)
+        
+        delays = [strategy._get_delay(attempt) for attempt in range(10)]
+        
+        assert all(0.5 <= d <= 5.0 for d in delays)
 
 
 class TestInputValidator:
@@ -138,6 +383,10 @@ class TestInputValidator:
         """Test invalid email validation"""
         assert InputValidator.validate_email("invalid-email") is False
     
+    def test_validate_email_trailing_newline(self):
+        """Test a trailing newline is not accepted"""
+        assert InputValidator.validate_email("test@example.com\n") is False
+    
     def test_validate_url_valid(self):
         """Test valid URL validation"""
         assert InputValidator.validate_url("https://example.com") is True
@@ -157,6 +406,12 @@ class TestInputValidator:
         valid, error = InputValidator.validate_command("")
         assert valid is False
         assert error is not None
+    
+    def test_validate_command_dangerous(self):
+        """Test dangerous keywords are rejected regardless of case"""
+        valid, error = InputValidator.validate_command("please RM  -rf /tmp")
+        assert valid is False
+        assert 'RM  -rf' in error
 
 
 class TestN8nWorkflowEngine:
@@ -210,12 +465,166 @@ class TestN8nWorkflowEngine:
         assert result['status'] == 'completed'
         assert result['nodes_executed'] > 0
     
+    @pytest.mark.asyncio
+    async def test_execute_workflow_fan_out(self, engine):
+        """Test independent branches run in the same level"""
+        workflow = engine.create_workflow("Fan-out", "Test")
+        source = engine.add_node(workflow.id, 'http_request', 'Fetch', {})
+        gmail = engine.add_node(workflow.id, 'gmail', 'Email', {})
+        slack = engine.add_node(workflow.id, 'slack', 'Notify', {})
+        engine.connect_nodes(workflow.id, source.id, gmail.id)
+        engine.connect_nodes(workflow.id, source.id, slack.id)
+        
+        levels, _ = engine._plan_execution(workflow)
+        result = await engine.execute_workflow(workflow.id)
+        
+        assert [[n.id for n in level] for level in levels] == [
+            [source.id], [gmail.id, slack.id]
+        ]
+        assert result['nodes_executed'] == 3
+    
+    @pytest.mark.asyncio
+    async def test_execute_workflow_unknown_node_type(self, engine):
+        """Test unknown node types fail before any node runs"""
+        workflow = engine.create_workflow("Test", "Test")
+        engine.add_node(workflow.id, 'gmail', 'Send Email', {})
+        engine.add_node(workflow.id, 'fax', 'Send Fax', {})
+        
+        with pytest.raises(ValueError):
+            await engine.execute_workflow(workflow.id)
+        
+        assert engine.get_execution_history(workflow.id)[-1]['status'] == 'failed'
+    
+    def test_execution_history_by_workflow_matches_full_history(self, engine):
+        """Test per-workflow history agrees with filtering the full history"""
+        for i in range(2400):
+            engine._record_execution({
+                'workflow_id': f"wf_{i % 2}",
+                'status': 'completed',
+                'execution_time': 0.01,
+            })
+        
+        full_history = engine.get_execution_history()
+        
+        assert len(full_history) == 2400
+        for workflow_id in ("wf_0", "wf_1"):
+            assert engine.get_execution_history(workflow_id) == [
+                record for record in full_history if record['workflow_id'] == workflow_id
+            ]
+    
     def test_workflow_statistics(self, engine):
         """Test workflow statistics"""
         stats = engine.get_statistics()
         
         assert 'total_workflows' in stats
         assert 'available_integrations' in stats
+    
+    @pytest.mark.asyncio
+    async def test_workflow_statistics_after_executions(self, engine):
+        """Test statistics track completed and failed executions"""
+        workflow = engine.create_workflow("Test", "Test")
+        engine.add_node(workflow.id, 'slack', 'Notify', {})
+        await engine.execute_workflow(workflow.id)
+        engine.add_node(workflow.id, 'fax', 'Send Fax', {})
+        with pytest.raises(ValueError):
+            await engine.execute_workflow(workflow.id)
+        
+        stats = engine.get_statistics()
+        
+        assert stats['successful_executions'] == 1
+        assert stats['failed_executions'] == 1
+        assert stats['success_rate'] == 0.5
+        assert stats['average_execution_time'] > 0
+
+
+
+class StubSecretsClient:
+    """Stand-in for the boto3 Secrets Manager client that counts fetches"""
+    
+    def __init__(self):
+        self.calls = []
+    
+    def get_secret_value(self, SecretId):
+        self.calls.append(SecretId)
+        return {'SecretString': '{"key": "value-for-%s"}' % SecretId}
+
+
+class TestSecretsManager:
+    """Test suite for the Secrets Manager cache"""
+    
+    @pytest.fixture
+    def secrets(self, monkeypatch):
+        """secrets_manager module with a counting stub client"""
+        if importlib.util.find_spec('boto3') is None:
+            botocore_exceptions = types.ModuleType('botocore.exceptions')
+            botocore_exceptions.ClientError = type('ClientError', (Exception,), {})
+            monkeypatch.setitem(sys.modules, 'boto3', types.ModuleType('boto3'))
+            monkeypatch.setitem(sys.modules, 'botocore', types.ModuleType('botocore'))
+            monkeypatch.setitem(sys.modules, 'botocore.exceptions', botocore_exceptions)
+        module = importlib.import_module('secrets_manager')
+        client = StubSecretsClient()
+        monkeypatch.setattr(module, '_get_client', lambda: client)
+        return module, client
+    
+    def test_secret_served_from_cache_within_ttl(self, secrets):
+        """Test a fresh secret is fetched once"""
+        module, client = secrets
+        manager = module.SecretsManager()
+        
+        first = manager.get_secret('api/test')
+        second = manager.get_secret('api/test')
+        
+        assert first == second == {'key': 'value-for-api/test'}
+        assert client.calls == ['api/test']
+    
+    def test_secret_refetched_after_expiry_or_invalidate(self, secrets):
+        """Test expired and invalidated secrets are fetched again"""
+        module, client = secrets
+        expired = module.SecretsManager(ttl=0)
+        expired.get_secret('api/test')
+        expired.get_secret('api/test')
+        
+        manager = module.SecretsManager()
+        manager.get_secret('api/other')
+        manager.invalidate('api/other')
+        manager.get_secret('api/other')
+        
+        assert client.calls == ['api/test'] * 2 + ['api/other'] * 2
+    
+    def test_mutating_returned_secret_keeps_cache_intact(self, secrets):
+        """Test callers get copies of cached JSON secrets"""
+        module, client = secrets
+        manager = module.SecretsManager()
+        
+        manager.get_secret('api/test')['key'] = 'changed'
+        
+        assert manager.get_secret('api/test') == {'key': 'value-for-api/test'}
+        assert len(client.calls) == 1
+    
+    @pytest.mark.parametrize("ttl", [0, 300])
+    def test_get_api_keys_fetches_each_missing_secret_once(self, secrets, ttl):
+        """Test get_api_keys issues one fetch per missing secret"""
+        module, client = secrets
+        manager = module.SecretsManager(ttl=ttl)
+        cached = manager._api_key_secret_name('openai')
+        manager.get_secret(cached)
+        client.calls.clear()
+        
+        keys = manager.get_api_keys()
+        
+        expected = len(module.API_KEY_SECRETS) - (1 if ttl else 0)
+        assert set(keys) == set(module.API_KEY_SECRETS)
+        assert len(client.calls) == len(set(client.calls)) == expected
+    
+    @pytest.mark.asyncio
+    async def test_get_api_keys_async_fetches_each_missing_secret_once(self, secrets):
+        """Test get_api_keys_async issues one fetch per missing secret"""
+        module, client = secrets
+        
+        keys = await module.SecretsManager(ttl=0).get_api_keys_async()
+        
+        assert set(keys) == set(module.API_KEY_SECRETS)
+        assert len(client.calls) == len(module.API_KEY_SECRETS)
 
 
 # Run tests